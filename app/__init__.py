@@ -1,23 +1,30 @@
 import os
 from flask import Flask
-from config import Config
+from config import config_by_name
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from app.ratelimit import RateLimiter
 
 # --- Database and extensions ---
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
+limiter = RateLimiter()
 # This tells Flask-Login which route handles logging in
 login_manager.login_view = 'main.login'
 # This is the message it will flash
 login_manager.login_message = 'Please log in to access this page.'
 
-def create_app(config_class=Config):
+def create_app(config_class=None):
     """
     The application factory. Creates and configures the Flask app.
+    If no config class is given, the FLASK_CONFIG env var picks one
+    of the profiles in config.config_by_name ('default' if unset).
     """
+    if config_class is None:
+        config_class = config_by_name[os.environ.get('FLASK_CONFIG') or 'default']
+
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(config_class)
 
@@ -40,12 +47,20 @@ def create_app(config_class=Config):
         pass # Already exists
     # --- END OF NEW CODE ---
 
+    # The rate limiter may keep its buckets in the instance folder,
+    # so it is set up after the folder exists.
+    limiter.init_app(app)
+
     # --- Register Blueprints ---
     # We import 'bp' (our Blueprint) from app.routes here
     # to avoid circular imports.
     from app.routes import bp as main_bp
     app.register_blueprint(main_bp)
 
+    # --- Register CLI commands ---
+    from app.commands import register_commands
+    register_commands(app)
+
     # --- Database context ---
     # This ensures that when the app is created,
     # it knows about the database models.
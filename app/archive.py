@@ -0,0 +1,126 @@
+import os
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from app import db
+from app.models import User, Donation, ArchivedDonation
+
+# Columns copied as-is from Donation to ArchivedDonation
+ARCHIVED_COLUMNS = [
+    'id', 'donation_type', 'estimated_weight_kg', 'amount', 'currency',
+    'image_filename', 'grade', 'description', 'timestamp', 'user_id', 'ngo_id',
+]
+
+
+def archive_exists():
+    """True once 'flask archive-donations' has created the archive table."""
+    return db.inspect(db.engines['archive']).has_table(ArchivedDonation.__tablename__)
+
+
+def _pack_images(donations, upload_folder, archive_folder):
+    """
+    Zips the images of a batch of donations into one bundle.
+    Returns (bundle_name, filenames_packed); bundle_name is None if the
+    batch had no images on disk.
+    """
+    filenames = [d.image_filename for d in donations
+                 if d.image_filename and os.path.isfile(os.path.join(upload_folder, d.image_filename))]
+    if not filenames:
+        return None, set()
+
+    bundle_name = f"donations-{datetime.now().strftime('%Y%m%d%H%M%S')}-{donations[0].id}.zip"
+    bundle_path = os.path.join(archive_folder, bundle_name)
+
+    # Write to a temp name first so a crash never leaves a half-written bundle
+    with zipfile.ZipFile(bundle_path + '.tmp', 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        for filename in filenames:
+            bundle.write(os.path.join(upload_folder, filename), arcname=filename)
+    os.replace(bundle_path + '.tmp', bundle_path)
+    return bundle_name, set(filenames)
+
+
+def archive_donations(older_than_days, batch_size=500):
+    """
+    Moves donations older than `older_than_days` into ArchivedDonation and
+    their images into zip bundles. Returns how many donations were moved.
+
+    User totals and the NGODailyStat rollups are running totals, so they
+    are left alone and still include archived donations.
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    archive_folder = current_app.config['ARCHIVE_FOLDER']
+    os.makedirs(archive_folder, exist_ok=True)
+    # The archive table is not managed by Alembic (env.py skips other binds'
+    # tables), so it is created here even when it shares the main database.
+    db.create_all(bind_key='archive')
+
+    # Timestamps are stored as naive UTC
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).replace(tzinfo=None)
+    moved = 0
+    while True:
+        batch = Donation.query.filter(Donation.timestamp < cutoff)\
+            .order_by(Donation.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        ids = [donation.id for donation in batch]
+        per_user = Counter(donation.user_id for donation in batch)
+
+        # After a crash between steps 1 and 2 some of these are already in
+        # the archive with their images bundled; reuse those bundles instead
+        # of packing the images again and orphaning the first bundle.
+        existing = dict(db.session.query(ArchivedDonation.id, ArchivedDonation.image_bundle)
+                        .filter(ArchivedDonation.id.in_(ids)))
+        bundle_name, packed = _pack_images(
+            [donation for donation in batch if not existing.get(donation.id)],
+            upload_folder, archive_folder)
+
+        # 1. Copy into the archive. merge() makes a re-run after a crash safe.
+        try:
+            for donation in batch:
+                archived = ArchivedDonation(**{col: getattr(donation, col) for col in ARCHIVED_COLUMNS})
+                if existing.get(donation.id):
+                    archived.image_bundle = existing[donation.id]
+                    packed.add(donation.image_filename) # Still on disk, remove it below
+                elif donation.image_filename in packed:
+                    archived.image_bundle = bundle_name
+                db.session.merge(archived)
+            db.session.commit()
+        except Exception:
+            # Nothing points at the new bundle yet, so don't leave it behind
+            db.session.rollback()
+            if bundle_name:
+                os.remove(os.path.join(archive_folder, bundle_name))
+            raise
+
+        # 2. Only then remove them from the hot table. The archive may share
+        # the SQLite file, so this is a separate commit to avoid lock waits.
+        # The users' archived counts go in the same commit, so a re-run after
+        # a crash can never count a donation twice.
+        Donation.query.filter(Donation.id.in_(ids)).delete(synchronize_session=False)
+        for user_id, count in per_user.items():
+            User.query.filter_by(id=user_id).update(
+                {User.archived_donation_count: db.func.coalesce(User.archived_donation_count, 0) + count},
+                synchronize_session=False)
+        db.session.commit()
+
+        # 3. The images are safe in the bundle now
+        for filename in packed:
+            try:
+                os.remove(os.path.join(upload_folder, filename))
+            except OSError:
+                pass # Already gone
+
+        moved += len(batch)
+    return moved
+
+
+def read_archived_image(bundle_name, filename):
+    """Returns the bytes of one image from an archive bundle, or None if missing."""
+    bundle_path = os.path.join(current_app.config['ARCHIVE_FOLDER'], bundle_name)
+    try:
+        with zipfile.ZipFile(bundle_path) as bundle:
+            return bundle.read(filename)
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
@@ -0,0 +1,69 @@
+import json
+import time
+import click
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import config_by_name
+from flask import current_app
+from app import limiter
+from app.ratelimit import SQLiteStore
+from app.archive import archive_donations
+from app.stats import backfill_daily_stats
+
+
+def register_commands(app):
+    """Attaches our custom 'flask <command>' CLI commands to the app."""
+
+    @app.cli.command('bench-login')
+    @click.option('--seconds', default=2.0, show_default=True,
+                  help='How long to measure each profile for.')
+    def bench_login(seconds):
+        """Reports password checks (logins) per second per core for each profile."""
+        # Every profile create_app() can pick with FLASK_CONFIG
+        for name, profile in config_by_name.items():
+            method = profile.PASSWORD_HASH_METHOD
+            pw_hash = generate_password_hash(
+                'benchmark-password', method=method,
+                salt_length=profile.PASSWORD_SALT_LENGTH)
+
+            # Single thread, so this is the throughput of one core
+            checks = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                check_password_hash(pw_hash, 'benchmark-password')
+                checks += 1
+            elapsed = time.perf_counter() - start
+
+            click.echo(f'{name:<12} {method:<28} '
+                       f'{checks / elapsed:10.1f} logins/sec/core '
+                       f'({elapsed / checks * 1000:.2f} ms each)')
+
+    @app.cli.command('backfill-stats')
+    def backfill_stats():
+        """Rebuilds the per-NGO daily stats rollups from all donations."""
+        count = backfill_daily_stats()
+        click.echo(f'Rebuilt {count} daily stat buckets.')
+
+    @app.cli.command('ratelimit-status')
+    def ratelimit_status():
+        """
+        Prints the current level of every rate limit bucket.
+        Only works with the shared SQLite store: memory buckets live inside
+        each server process, so this separate process can't see them.
+        """
+        if not isinstance(limiter.store, SQLiteStore):
+            raise click.ClickException(
+                'Rate limit buckets are kept in each server process (RATELIMIT_STORAGE=memory), '
+                'so they can\'t be read from here. Use RATELIMIT_STORAGE=sqlite '
+                '(the default with FLASK_CONFIG=production) or the /ratelimits page.')
+        click.echo(json.dumps(limiter.levels(), indent=2))
+
+    @app.cli.command('archive-donations')
+    @click.option('--days', type=int, default=None,
+                  help='Archive donations older than this. Defaults to ARCHIVE_AFTER_DAYS.')
+    @click.option('--batch-size', default=500, show_default=True)
+    def archive_donations_command(days, batch_size):
+        """Moves old donations and their images into the archive."""
+        if days is None:
+            days = current_app.config['ARCHIVE_AFTER_DAYS']
+        moved = archive_donations(days, batch_size=batch_size)
+        click.echo(f'Archived {moved} donations older than {days} days.')
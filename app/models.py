@@ -1,7 +1,26 @@
 from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 from app import db, login_manager
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+def normalize_hash_method(method):
+    """
+    Expands a Werkzeug method string to the full form Werkzeug stores
+    in the hash, e.g. 'pbkdf2' -> 'pbkdf2:sha256:1000000'.
+    """
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        hash_name = args[0] if len(args) > 0 else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{int(iterations)}'
+    if name == 'scrypt':
+        n, r, p = map(int, args) if args else (2**15, 8, 1)
+        return f'scrypt:{n}:{r}:{p}'
+    return method
 
 # The @login_manager.user_loader decorator registers this function with Flask-Login
 @login_manager.user_loader
@@ -20,19 +39,41 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256)) # Increased length for stronger hashes
     
     # User's total tracked stats
+    # (kept as running totals so archiving old donations doesn't change them)
     total_waste_diverted_kg = db.Column(db.Float, default=0.0)
+    total_money_donated = db.Column(db.Float, default=0.0)
+    # How many of this user's donations have been moved to the archive,
+    # so the profile page knows about older history without opening it
+    archived_donation_count = db.Column(db.Integer, default=0)
     
     # Defines the relationship to the Donation model
     donations = db.relationship('Donation', backref='donator', lazy='dynamic')
 
     def set_password(self, password):
-        """Hashes and stores the user's password."""
-        self.password_hash = generate_password_hash(password)
+        """Hashes and stores the user's password using the configured method."""
+        self.password_hash = generate_password_hash(
+            password,
+            method=current_app.config['PASSWORD_HASH_METHOD'],
+            salt_length=current_app.config['PASSWORD_SALT_LENGTH'])
 
     def check_password(self, password):
         """Checks if the provided password matches the hash."""
+        if not self.password_hash:
+            return False
         return check_password_hash(self.password_hash, password)
 
+    def password_needs_rehash(self):
+        """
+        True if the stored hash was made with a different method, cost
+        or salt length than the current config asks for.
+        """
+        if not self.password_hash or self.password_hash.count('$') != 2:
+            return True
+        method, salt, _ = self.password_hash.split('$')
+        wanted = normalize_hash_method(current_app.config['PASSWORD_HASH_METHOD'])
+        return (method != wanted
+                or len(salt) != current_app.config['PASSWORD_SALT_LENGTH'])
+
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -66,6 +107,39 @@ class Donation(db.Model):
             return f'<Donation {self.id}: {self.amount} {self.currency}>'
         return f'<Donation {self.id}: {self.estimated_weight_kg}kg of {self.donation_type}>'
 
+class ArchivedDonation(db.Model):
+    """
+    A donation moved out of the hot Donation table by 'flask archive-donations'.
+    Lives in the 'archive' bind, which may be a separate database, so it
+    has no foreign keys and looks up its NGO by id.
+    """
+    __bind_key__ = 'archive'
+    __table_args__ = (
+        db.Index('ix_archived_donation_user_time', 'user_id', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False) # Same id as the original Donation
+    donation_type = db.Column(db.String(50), nullable=False)
+    estimated_weight_kg = db.Column(db.Float, nullable=True)
+    amount = db.Column(db.Float, nullable=True)
+    currency = db.Column(db.String(3), nullable=True)
+    image_filename = db.Column(db.String(100), nullable=True)
+    image_bundle = db.Column(db.String(100), nullable=True) # .zip in ARCHIVE_FOLDER holding the image
+    grade = db.Column(db.String(10), nullable=True)
+    description = db.Column(db.Text)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    ngo_id = db.Column(db.Integer, nullable=False)
+    archived_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    @property
+    def ngo(self):
+        """Same as Donation.ngo, so templates can treat both alike."""
+        return db.session.get(NGO, self.ngo_id)
+
+    def __repr__(self):
+        return f'<ArchivedDonation {self.id}: {self.donation_type}>'
+
 class NGO(db.Model):
     """
     NGO / Collection Center database model.
@@ -83,3 +157,52 @@ class NGO(db.Model):
     def __repr__(self):
         return f'<NGO {self.name}>'
 
+
+
+class NGODailyStat(db.Model):
+    """
+    Daily rollup of donations per NGO, donation type and grade.
+    Kept up to date on every flush (see add_to_daily_stats below) so the
+    partner stats pages never have to scan the raw Donation table.
+    """
+    ngo_id = db.Column(db.Integer, db.ForeignKey('ngo.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    donation_type = db.Column(db.String(50), primary_key=True)
+    grade = db.Column(db.String(10), primary_key=True, default='') # '' = no grade
+    
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    total_kg = db.Column(db.Float, nullable=False, default=0.0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f'<NGODailyStat {self.ngo_id} {self.day} {self.donation_type} {self.grade}>'
+
+
+def add_to_daily_stats(connection, donation):
+    """Adds one donation to its (ngo, day, type, grade) rollup bucket."""
+    stats = NGODailyStat.__table__
+    key = {
+        'ngo_id': donation.ngo_id,
+        'day': donation.timestamp.date(),
+        'donation_type': donation.donation_type,
+        'grade': donation.grade or '',
+    }
+    kg = donation.estimated_weight_kg or 0.0
+    amount = donation.amount or 0.0
+
+    # One upsert: create the bucket, or bump it if it already exists
+    # (same INSERT ... ON CONFLICT DO UPDATE as the rate limiter's store)
+    upsert = sqlite_insert(stats).values(**key, donation_count=1, total_kg=kg, total_amount=amount)
+    connection.execute(upsert.on_conflict_do_update(
+        index_elements=list(key),
+        set_={'donation_count': stats.c.donation_count + 1,
+              'total_kg': stats.c.total_kg + upsert.excluded.total_kg,
+              'total_amount': stats.c.total_amount + upsert.excluded.total_amount}))
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_daily_stats(session, flush_context):
+    """Rolls newly inserted donations into NGODailyStat in the same transaction."""
+    for obj in session.new:
+        if isinstance(obj, Donation):
+            add_to_daily_stats(session.connection(), obj)
@@ -0,0 +1,177 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+
+def _refill(tokens, updated, now, capacity, rate):
+    """Tops a bucket back up for the time passed since it was last touched."""
+    if tokens is None:
+        return float(capacity)
+    return min(float(capacity), tokens + max(0.0, now - updated) * rate)
+
+
+def _take(tokens, capacity, rate):
+    """
+    Tries to take one token from a (refilled) bucket.
+    Returns (tokens_left, allowed, retry_after_seconds).
+    """
+    if tokens >= 1:
+        return tokens - 1, True, 0.0
+    return tokens, False, (1 - tokens) / rate
+
+
+class MemoryStore:
+    """Token buckets kept in this process. Each worker process has its own."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(key, (None, now))
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            tokens, allowed, retry_after = _take(tokens, capacity, rate)
+            self._buckets[key] = (tokens, now)
+            return allowed, retry_after
+
+    def level(self, key, capacity, rate):
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(key, (None, now))
+            return _refill(tokens, updated, now, capacity, rate)
+
+    def keys(self, prefix):
+        with self._lock:
+            return [key for key in self._buckets if key.startswith(prefix)]
+
+
+class SQLiteStore:
+    """
+    Token buckets kept in a small SQLite file, so every worker process on
+    the machine shares the same limits. Each take() runs in its own
+    write transaction, which makes it atomic across processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local() # sqlite3 connections are per-thread
+
+        # This runs inside create_app(), which a pre-forking server (e.g.
+        # gunicorn --preload) calls in the master process. Use a throwaway
+        # connection so no connection is inherited by the workers.
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS bucket ('
+                         'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A connection made before a fork belongs to the parent process;
+        # never use it in the child, open a fresh one instead.
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, capacity, rate):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+            tokens = _refill(row[0] if row else None, row[1] if row else now, now, capacity, rate)
+            tokens, allowed, retry_after = _take(tokens, capacity, rate)
+            conn.execute('INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                         'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                         (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def level(self, key, capacity, rate):
+        now = time.time()
+        row = self._connect().execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+        return _refill(row[0] if row else None, row[1] if row else now, now, capacity, rate)
+
+    def keys(self, prefix):
+        rows = self._connect().execute('SELECT key FROM bucket WHERE substr(key, 1, ?) = ?',
+                                       (len(prefix), prefix))
+        return [row[0] for row in rows]
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter, set up like our other extensions
+    (limiter = RateLimiter(); limiter.init_app(app)).
+
+    Limits are named in config as RATELIMIT_LIMITS = {name: (burst, seconds)}:
+    a bucket holds up to `burst` tokens and refills fully in `seconds`.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.limits = {}
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.limits = dict(app.config.get('RATELIMIT_LIMITS', {}))
+        if app.config.get('RATELIMIT_STORAGE') == 'sqlite':
+            self.store = SQLiteStore(app.config['RATELIMIT_SQLITE_PATH'])
+        else:
+            self.store = MemoryStore()
+        app.extensions['ratelimit'] = self
+
+    def _bucket(self, name, key):
+        burst, seconds = self.limits[name]
+        return f'{name}:{key}', burst, burst / seconds
+
+    def hit(self, name, key='global'):
+        """
+        Uses one token from the `name` bucket for `key`.
+        Returns (allowed, retry_after), with retry_after in whole seconds.
+        """
+        if not self.enabled or name not in self.limits:
+            return True, 0
+        bucket, burst, rate = self._bucket(name, key)
+        allowed, retry_after = self.store.take(bucket, burst, rate)
+        return allowed, math.ceil(retry_after)
+
+    def level(self, name, key='global'):
+        """
+        Returns how many tokens the bucket has left right now, rounded to
+        2 places, or None if the limiter is disabled or `name` has no
+        configured limit (the same cases in which hit() never blocks).
+        """
+        if not self.enabled or name not in self.limits:
+            return None
+        bucket, burst, rate = self._bucket(name, key)
+        return round(self.store.level(bucket, burst, rate), 2)
+
+    def levels(self):
+        """
+        Snapshot of every known bucket, for monitoring:
+        {name: {key: {'tokens': ..., 'capacity': ...}}}
+        """
+        snapshot = {}
+        for name, (burst, seconds) in self.limits.items():
+            snapshot[name] = {}
+            for bucket in self.store.keys(f'{name}:'):
+                key = bucket[len(name) + 1:]
+                snapshot[name][key] = {
+                    'tokens': round(self.store.level(bucket, burst, burst / seconds), 2),
+                    'capacity': burst,
+                }
+        return snapshot
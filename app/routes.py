@@ -1,10 +1,15 @@
 import os
 import base64
+import mimetypes
+from io import BytesIO
 import time 
 import requests 
-from flask import render_template, flash, redirect, url_for, request, Blueprint, current_app, send_from_directory
-from app import db
-from app.models import User, Donation, NGO
+from flask import render_template, flash, redirect, url_for, request, Blueprint, current_app, send_from_directory, send_file, jsonify, abort
+from app import db, limiter
+from app.models import User, Donation, ArchivedDonation, NGO, NGODailyStat
+from app.stats import get_ngo_stats, parse_day, PERIOD_FORMATS
+from app.search import search_ngos, search_donations
+from app.archive import read_archived_image
 from app.forms import LoginForm, RegistrationForm, DonationForm
 from flask_login import login_user, logout_user, current_user, login_required
 from urllib.parse import urlparse
@@ -92,16 +97,31 @@ def get_ai_grade(image_path):
 @bp.route('/index')
 def index():
     """Home page."""
-    total_diverted = db.session.query(db.func.sum(Donation.estimated_weight_kg)).scalar() or 0.0
+    # Read from the daily rollups, which also cover archived donations
+    total_diverted = db.session.query(db.func.sum(NGODailyStat.total_kg)).scalar() or 0.0
     return render_template('index.html',
                            title='Home',
                            total_diverted=total_diverted)
 
+def too_many_requests(retry_after, message):
+    """Builds a 429 response telling the client when it may try again."""
+    response = current_app.make_response(
+        (render_template('429.html', title='Slow Down', message=message,
+                         retry_after=retry_after), 429))
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 # --- THIS IS THE UPDATED DONATE ROUTE ---
 @bp.route('/donate', methods=['GET', 'POST'])
 @login_required
 def donate():
     """Donation page (clothes and money) with AI image grading."""
+    # Each POST may store an upload and trigger a paid AI call, so limit them per user
+    if request.method == 'POST':
+        allowed, retry_after = limiter.hit('donate', current_user.id)
+        if not allowed:
+            return too_many_requests(retry_after, 'You are logging donations too quickly.')
+
     form = DonationForm()
     form.ngo_id.choices = [(ngo.id, ngo.name) for ngo in NGO.query.order_by(NGO.name).all()]
     
@@ -122,13 +142,23 @@ def donate():
                 ngo_id=form.ngo_id.data
                 # image_filename and grade remain NULL
             )
+            
+            user = User.query.get(current_user.id)
+            user.total_money_donated = (user.total_money_donated or 0.0) + float(form.amount.data)
+            
             db.session.add(donation)
+            db.session.add(user)
             
         else: # This handles 'Clothes' and 'Other'
             
             # --- NEW IMAGE HANDLING LOGIC ---
             image_file = form.image.data
             if image_file:
+                # The AI grading quota is shared by everyone, so check it before saving anything
+                allowed, retry_after = limiter.hit('ai_grade')
+                if not allowed:
+                    return too_many_requests(retry_after, 'Our image grader is busy right now.')
+
                 # 1. Save the file
                 filename = secure_filename(image_file.filename)
                 # Ensure unique filename to avoid overwrites
@@ -176,9 +206,69 @@ def donate():
 
 @bp.route('/find_ngo')
 def find_ngo():
-    """Page to find nearby NGOs/centers in Chennai."""
+    """Page to find nearby NGOs/centers in Chennai, with optional search."""
+    q = request.args.get('q', '').strip()
+    if q:
+        # Ranked full-text search instead of listing every center
+        search = search_ngos(q, page=request.args.get('page', 1, type=int))
+        return render_template('find_ngo.html', title='Find Centers',
+                               ngos=search['results'], search=search, q=q)
     ngos = NGO.query.all()
-    return render_template('find_ngo.html', title='Find Centers', ngos=ngos)
+    return render_template('find_ngo.html', title='Find Centers', ngos=ngos, q=q)
+
+@bp.route('/search/ngos')
+def search_ngos_json():
+    """JSON search over NGO names and addresses: ?q=...&page=...&per_page=..."""
+    return jsonify(search_ngos(request.args.get('q', ''),
+                               page=request.args.get('page', 1, type=int),
+                               per_page=request.args.get('per_page', 20, type=int)))
+
+@bp.route('/search/donations')
+@login_required
+def search_donations_json():
+    """JSON search over the current user's donation descriptions."""
+    return jsonify(search_donations(request.args.get('q', ''), current_user.id,
+                                    page=request.args.get('page', 1, type=int),
+                                    per_page=request.args.get('per_page', 20, type=int)))
+
+@bp.route('/ngo/<int:ngo_id>/stats')
+def ngo_stats(ngo_id):
+    """Partner dashboard: kg, grade mix and money per day/month/year for one center."""
+    ngo = NGO.query.get_or_404(ngo_id)
+    period = request.args.get('period', 'day')
+    if period not in PERIOD_FORMATS:
+        period = 'day'
+    stats = get_ngo_stats(ngo.id, period,
+                          start=parse_day(request.args.get('start')),
+                          end=parse_day(request.args.get('end')))
+    return render_template('ngo_stats.html', title=f'{ngo.name} Stats',
+                           ngo=ngo, period=period, stats=stats)
+
+@bp.route('/ngo/<int:ngo_id>/stats.json')
+def ngo_stats_json(ngo_id):
+    """Same data as the stats page, as JSON for partner dashboards."""
+    ngo = NGO.query.get_or_404(ngo_id)
+    period = request.args.get('period', 'day')
+    if period not in PERIOD_FORMATS:
+        return jsonify(error=f"period must be one of: {', '.join(PERIOD_FORMATS)}"), 400
+    stats = get_ngo_stats(ngo.id, period,
+                          start=parse_day(request.args.get('start')),
+                          end=parse_day(request.args.get('end')))
+    return jsonify(ngo_id=ngo.id, name=ngo.name, period=period, stats=stats)
+
+@bp.route('/ratelimits')
+@login_required
+def ratelimit_levels():
+    """
+    JSON view of the current user's donate bucket and the global grading
+    bucket. A level is null when rate limiting is disabled
+    (RATELIMIT_ENABLED = False) or that limit isn't in RATELIMIT_LIMITS.
+    """
+    return jsonify(
+        donate=limiter.level('donate', current_user.id),
+        ai_grade=limiter.level('ai_grade'),
+        limits={name: {'burst': burst, 'seconds': seconds}
+                for name, (burst, seconds) in limiter.limits.items()})
 
 @bp.route('/leaderboard')
 def leaderboard():
@@ -188,12 +278,11 @@ def leaderboard():
     top_waste_donators = User.query.order_by(User.total_waste_diverted_kg.desc()).limit(10).all()
     
     # Query for Top Money Donators
+    # (a running total like the one above, so archived donations still count)
     top_money_donators = db.session.query(
         User.username,
-        db.func.sum(Donation.amount).label('total_donated')
-    ).join(Donation, User.id == Donation.user_id)\
-     .filter(Donation.donation_type == 'Money')\
-     .group_by(User.username)\
+        User.total_money_donated.label('total_donated')
+    ).filter(User.total_money_donated > 0)\
      .order_by(desc('total_donated'))\
      .limit(10).all()
 
@@ -220,9 +309,33 @@ def events():
 @bp.route('/profile')
 @login_required
 def profile():
-    """User profile page showing their stats."""
-    user_donations = current_user.donations.order_by(Donation.timestamp.desc()).all()
-    return render_template('profile.html', title='My Profile', donations=user_donations)
+    """
+    User profile page showing their stats and donations, newest first.
+    The first pages come from the hot Donation table; the archive is only
+    read once the user pages past the end of it.
+    """
+    per_page = current_app.config['PROFILE_PAGE_SIZE']
+    page = max(1, request.args.get('page', 1, type=int))
+
+    # Both counts come from the main database, so the archive stays closed
+    hot_total = current_user.donations.count()
+    archived_total = current_user.archived_donation_count or 0
+    hot_pages = -(-hot_total // per_page) # Round up
+    total_pages = hot_pages + -(-archived_total // per_page)
+
+    if page <= hot_pages:
+        user_donations = current_user.donations.order_by(Donation.timestamp.desc())\
+            .offset((page - 1) * per_page).limit(per_page).all()
+    elif archived_total:
+        user_donations = ArchivedDonation.query.filter_by(user_id=current_user.id)\
+            .order_by(ArchivedDonation.timestamp.desc())\
+            .offset((page - hot_pages - 1) * per_page).limit(per_page).all()
+    else:
+        user_donations = []
+
+    return render_template('profile.html', title='My Profile', donations=user_donations,
+                           page=page, has_next=page < total_pages,
+                           archived=archived_total > 0 and page > hot_pages)
 
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -236,6 +349,11 @@ def login():
         if user is None or not user.check_password(form.password.data):
             flash('Invalid username or password')
             return redirect(url_for('main.login'))
+
+        # Upgrade hashes made with old parameters now that we have the plain password
+        if user.password_needs_rehash():
+            user.set_password(form.password.data)
+            db.session.commit()
         
         login_user(user, remember=form.remember_me.data)
         next_page = request.args.get('next')
@@ -278,4 +396,14 @@ def get_uploaded_file(filename):
     try:
         return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
     except FileNotFoundError:
-        return "File not found.", 404
\ No newline at end of file
+        return "File not found.", 404
+
+@bp.route('/uploads/archive/<bundle>/<path:filename>')
+@login_required
+def get_archived_file(bundle, filename):
+    """Serves an image of an archived donation out of its zip bundle."""
+    data = read_archived_image(secure_filename(bundle), filename)
+    if data is None:
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    return send_file(BytesIO(data), mimetype=mimetype, download_name=filename)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import text
+from app import db
+
+# snippet() wraps matches in these, and we swap them for <mark> after
+# escaping, so user text in the snippet can't inject HTML.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+MAX_PER_PAGE = 50
+
+
+def build_match_query(q):
+    """
+    Turns free text from a search box into a safe FTS5 MATCH expression.
+    Every word is quoted (so FTS5 operators in the input are ignored) and
+    the last word is a prefix match, so results show up while typing.
+    Returns None if there is nothing to search for.
+    """
+    words = re.findall(r'\w+', q or '')
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _clamp_per_page(per_page):
+    """Keeps a requested page size between 1 and MAX_PER_PAGE."""
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def _highlight(snippet):
+    """Escapes a raw FTS5 snippet and turns our match markers into <mark> tags."""
+    html = str(escape(snippet or ''))
+    return Markup(html.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+
+def _search(count_sql, hits_sql, match, page, per_page, **params):
+    """
+    Runs a ranked FTS5 query for one page. Returns (page, per_page, total,
+    rows), with page and per_page clamped to sensible values.
+    """
+    per_page = _clamp_per_page(per_page)
+    page = max(1, page)
+    params.update(match=match, start=_MARK_START, end=_MARK_END,
+                  limit=per_page, offset=(page - 1) * per_page)
+    total = db.session.execute(text(count_sql), params).scalar()
+    rows = db.session.execute(text(hits_sql), params).mappings().all()
+    return page, per_page, total, rows
+
+
+def search_ngos(q, page=1, per_page=20):
+    """
+    Full-text search over NGO names and addresses, best match first.
+    Returns a dict with paging info and a list of hits with snippets.
+    """
+    match = build_match_query(q)
+    if match is None:
+        return {'query': q, 'page': 1, 'per_page': _clamp_per_page(per_page), 'total': 0, 'results': []}
+
+    page, per_page, total, rows = _search(
+        'SELECT count(*) FROM ngo_fts WHERE ngo_fts MATCH :match',
+        '''SELECT ngo.id, ngo.name, ngo.address, ngo.latitude, ngo.longitude,
+                  snippet(ngo_fts, -1, :start, :end, '...', 12) AS snippet
+           FROM ngo_fts JOIN ngo ON ngo.id = ngo_fts.rowid
+           WHERE ngo_fts MATCH :match
+           ORDER BY bm25(ngo_fts, 2.0, 1.0)
+           LIMIT :limit OFFSET :offset''',
+        match, page, per_page)
+
+    results = [dict(row, snippet=_highlight(row['snippet'])) for row in rows]
+    return {'query': q, 'page': page, 'per_page': per_page, 'total': total, 'results': results}
+
+
+def search_donations(q, user_id, page=1, per_page=20):
+    """
+    Full-text search over one user's donation descriptions, best match first.
+    """
+    match = build_match_query(q)
+    if match is None:
+        return {'query': q, 'page': 1, 'per_page': _clamp_per_page(per_page), 'total': 0, 'results': []}
+
+    page, per_page, total, rows = _search(
+        '''SELECT count(*) FROM donation_fts
+           JOIN donation ON donation.id = donation_fts.rowid
+           WHERE donation_fts MATCH :match AND donation.user_id = :user_id''',
+        '''SELECT donation.id, donation.donation_type, donation.timestamp,
+                  donation.ngo_id, donation.grade,
+                  snippet(donation_fts, 0, :start, :end, '...', 16) AS snippet
+           FROM donation_fts JOIN donation ON donation.id = donation_fts.rowid
+           WHERE donation_fts MATCH :match AND donation.user_id = :user_id
+           ORDER BY bm25(donation_fts)
+           LIMIT :limit OFFSET :offset''',
+        match, page, per_page, user_id=user_id)
+
+    results = [dict(row, snippet=_highlight(row['snippet'])) for row in rows]
+    return {'query': q, 'page': page, 'per_page': per_page, 'total': total, 'results': results}
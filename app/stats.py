@@ -0,0 +1,107 @@
+from datetime import date
+from sqlalchemy import func
+from app import db
+from app.models import Donation, ArchivedDonation, NGODailyStat
+from app.archive import archive_exists
+
+# How each period groups the daily buckets
+PERIOD_FORMATS = {
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m',
+    'year': '%Y',
+}
+
+
+def get_ngo_stats(ngo_id, period='day', start=None, end=None):
+    """
+    Returns the stats of one NGO grouped by day, month or year, newest first.
+    Only reads the NGODailyStat rollups; months and years are summed from
+    the daily buckets.
+    """
+    query = NGODailyStat.query.filter_by(ngo_id=ngo_id)
+    if start:
+        query = query.filter(NGODailyStat.day >= start)
+    if end:
+        query = query.filter(NGODailyStat.day <= end)
+
+    fmt = PERIOD_FORMATS[period]
+    buckets = {}
+    for row in query.order_by(NGODailyStat.day.desc()):
+        label = row.day.strftime(fmt)
+        bucket = buckets.setdefault(label, {
+            'period': label,
+            'donations': 0,
+            'total_kg': 0.0,
+            'total_amount': 0.0,
+            'by_type': {},
+            'grades': {},
+        })
+        bucket['donations'] += row.donation_count
+        bucket['total_kg'] += row.total_kg
+        bucket['total_amount'] += row.total_amount
+
+        by_type = bucket['by_type'].setdefault(
+            row.donation_type, {'donations': 0, 'total_kg': 0.0, 'total_amount': 0.0})
+        by_type['donations'] += row.donation_count
+        by_type['total_kg'] += row.total_kg
+        by_type['total_amount'] += row.total_amount
+
+        # Grade mix is the kg collected per AI grade
+        if row.grade:
+            bucket['grades'][row.grade] = bucket['grades'].get(row.grade, 0.0) + row.total_kg
+
+    return list(buckets.values())
+
+
+def parse_day(value):
+    """Parses a 'YYYY-MM-DD' query arg, returning None if missing or invalid."""
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _daily_totals(model):
+    """Groups one donation table into (ngo, day, type, grade) totals."""
+    grade = func.coalesce(model.grade, '')
+    day = func.date(model.timestamp)
+    return db.session.execute(db.select(
+        model.ngo_id,
+        day,
+        model.donation_type,
+        grade,
+        func.count(model.id),
+        func.coalesce(func.sum(model.estimated_weight_kg), 0.0),
+        func.coalesce(func.sum(model.amount), 0.0),
+    ).group_by(model.ngo_id, day, model.donation_type, grade))
+
+
+def backfill_daily_stats():
+    """
+    Rebuilds NGODailyStat from scratch out of the Donation table and,
+    if there is one, the donation archive.
+    Returns the number of daily buckets written.
+    """
+    sources = [Donation]
+    if archive_exists():
+        sources.append(ArchivedDonation)
+
+    # The archive may be a separate database, so the two are summed here
+    buckets = {}
+    for model in sources:
+        for ngo_id, day, donation_type, grade, count, kg, amount in _daily_totals(model):
+            key = (ngo_id, date.fromisoformat(str(day)[:10]), donation_type, grade)
+            bucket = buckets.setdefault(key, [0, 0.0, 0.0])
+            bucket[0] += count
+            bucket[1] += kg
+            bucket[2] += amount
+
+    NGODailyStat.query.delete()
+    if buckets:
+        db.session.execute(NGODailyStat.__table__.insert(), [
+            {'ngo_id': ngo_id, 'day': day, 'donation_type': donation_type, 'grade': grade,
+             'donation_count': count, 'total_kg': kg, 'total_amount': amount}
+            for (ngo_id, day, donation_type, grade), (count, kg, amount) in buckets.items()
+        ])
+    db.session.commit()
+    return len(buckets)
@@ -20,8 +20,81 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'instance', 'smart_recycler.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # --- ARCHIVE DATABASE ---
+    # Old donations are moved into the 'archive' bind by
+    # 'flask archive-donations'. Set ARCHIVE_DATABASE_URL to keep them in
+    # a separate SQLite file; by default they live in the main database.
+    # The archive is only opened when someone pages into old history.
+    SQLALCHEMY_BINDS = {
+        'archive': os.environ.get('ARCHIVE_DATABASE_URL') or SQLALCHEMY_DATABASE_URI,
+    }
     
     # --- NEW UPLOAD CONFIG ---
     # Define the upload folder inside the 'instance' folder
     # This is where your donation images will be saved.
-    UPLOAD_FOLDER = os.path.join(basedir, 'instance', 'uploads')
\ No newline at end of file
+    UPLOAD_FOLDER = os.path.join(basedir, 'instance', 'uploads')
+
+    # --- ARCHIVAL CONFIG ---
+    # Donations older than this many days are archived, and their images
+    # are packed into compressed .zip bundles in ARCHIVE_FOLDER.
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS') or 365)
+    ARCHIVE_FOLDER = os.path.join(basedir, 'instance', 'archive')
+
+    # How many donations the profile page shows at a time
+    PROFILE_PAGE_SIZE = 20
+
+    # --- PASSWORD HASHING CONFIG ---
+    # Werkzeug method string ('pbkdf2:<hash>:<iterations>' or
+    # 'scrypt:<n>:<r>:<p>') and salt length used by User.set_password.
+    # Raising the cost makes each login slower; stored hashes made with
+    # older parameters are upgraded on the user's next successful login.
+    # Run 'flask bench-login' to see the logins/sec each profile allows.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 16)
+
+
+    # --- RATE LIMIT CONFIG ---
+    # Each limit is (burst, seconds): up to `burst` requests at once,
+    # refilling fully over `seconds`.
+    #   'donate'   - per user, every POST to /donate
+    #   'ai_grade' - shared by all users, every paid get_ai_grade() call
+    RATELIMIT_ENABLED = True
+    RATELIMIT_LIMITS = {
+        'donate': (10, 600),
+        'ai_grade': (100, 3600),
+    }
+    # 'memory' keeps buckets per worker process; 'sqlite' shares them
+    # between all workers through a small SQLite file.
+    RATELIMIT_STORAGE = os.environ.get('RATELIMIT_STORAGE') or 'memory'
+    RATELIMIT_SQLITE_PATH = os.path.join(basedir, 'instance', 'ratelimit.db')
+
+
+class ProductionConfig(Config):
+    """
+    Production settings. Uses the full password hashing cost from the
+    defaults above, and shares rate limits between worker processes.
+    """
+    DEBUG = False
+    RATELIMIT_STORAGE = os.environ.get('RATELIMIT_STORAGE') or 'sqlite'
+
+
+class TestingConfig(Config):
+    """
+    Settings for automated tests: in-memory database, no CSRF,
+    and a cheap password hash so logins don't dominate test time.
+    """
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_BINDS = {'archive': 'sqlite://'}
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_SALT_LENGTH = 8
+
+# Profiles that create_app() can pick with the FLASK_CONFIG env var,
+# e.g. FLASK_CONFIG=production in the server's .env file.
+config_by_name = {
+    'default': Config,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
@@ -51,6 +51,32 @@ def get_metadata():
     return target_db.metadata
 
 
+# Tables that are created by hand in migrations rather than from models,
+# so autogenerate must not offer to drop them: the FTS5 search tables
+# (ngo_fts, donation_fts) and the shadow tables SQLite makes for them.
+UNMANAGED_TABLE_PREFIXES = ('ngo_fts', 'donation_fts')
+
+
+def get_bind_tables():
+    """
+    Names of tables that belong to other binds (e.g. 'archive'). Those
+    are created by the app, and may share this database, so autogenerate
+    must leave them alone too.
+    """
+    if not hasattr(target_db, 'metadatas'):
+        return set()
+    return {name for key, metadata in target_db.metadatas.items() if key is not None
+            for name in metadata.tables}
+
+
+def include_name(name, type_, parent_names):
+    # Indexes, columns etc. are filtered by the table they belong to
+    table = name if type_ == 'table' else parent_names.get('table_name')
+    if table is None:
+        return True
+    return not (table.startswith(UNMANAGED_TABLE_PREFIXES) or table in get_bind_tables())
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +91,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -100,6 +127,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_name=include_name,
             **conf_args
         )
 
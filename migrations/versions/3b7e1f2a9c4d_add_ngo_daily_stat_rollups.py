@@ -0,0 +1,48 @@
+"""Add ngo_daily_stat rollup table
+
+Revision ID: 3b7e1f2a9c4d
+Revises: 6920d0b6548f
+Create Date: 2026-10-19 10:12:40.218455
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1f2a9c4d'
+down_revision = '6920d0b6548f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ngo_daily_stat',
+    sa.Column('ngo_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('donation_type', sa.String(length=50), nullable=False),
+    sa.Column('grade', sa.String(length=10), nullable=False),
+    sa.Column('donation_count', sa.Integer(), nullable=False),
+    sa.Column('total_kg', sa.Float(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['ngo_id'], ['ngo.id'], ),
+    sa.PrimaryKeyConstraint('ngo_id', 'day', 'donation_type', 'grade')
+    )
+
+    # Roll up the donations logged so far, so totals are right straight away.
+    # New donations are added by the after_flush hook in app/models.py, and
+    # 'flask backfill-stats' can rebuild the table at any time.
+    op.execute("""
+        INSERT INTO ngo_daily_stat
+            (ngo_id, day, donation_type, grade, donation_count, total_kg, total_amount)
+        SELECT ngo_id, date(timestamp), donation_type, COALESCE(grade, ''),
+               count(*),
+               COALESCE(SUM(estimated_weight_kg), 0.0),
+               COALESCE(SUM(amount), 0.0)
+        FROM donation
+        WHERE timestamp IS NOT NULL
+        GROUP BY ngo_id, date(timestamp), donation_type, COALESCE(grade, '')""")
+
+
+def downgrade():
+    op.drop_table('ngo_daily_stat')
@@ -0,0 +1,85 @@
+"""Add FTS5 search tables for NGOs and donation descriptions
+
+Revision ID: 8d4c2e6f1a5b
+Revises: 3b7e1f2a9c4d
+Create Date: 2026-10-19 11:02:17.530914
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4c2e6f1a5b'
+down_revision = '3b7e1f2a9c4d'
+branch_labels = None
+depends_on = None
+
+
+# FTS5 is SQLite only. These are "external content" tables: they store
+# just the search index and read the text from ngo/donation, and the
+# triggers below keep the index in step with every insert/update/delete.
+# They have no model, so migrations/env.py skips them in autogenerate;
+# keep UNMANAGED_TABLE_PREFIXES there in sync if you add another one.
+def upgrade():
+    op.execute("""
+        CREATE VIRTUAL TABLE ngo_fts USING fts5(
+            name, address,
+            content='ngo', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )""")
+    op.execute("""
+        CREATE TRIGGER ngo_fts_ai AFTER INSERT ON ngo BEGIN
+            INSERT INTO ngo_fts(rowid, name, address)
+            VALUES (new.id, new.name, new.address);
+        END""")
+    op.execute("""
+        CREATE TRIGGER ngo_fts_ad AFTER DELETE ON ngo BEGIN
+            INSERT INTO ngo_fts(ngo_fts, rowid, name, address)
+            VALUES ('delete', old.id, old.name, old.address);
+        END""")
+    op.execute("""
+        CREATE TRIGGER ngo_fts_au AFTER UPDATE OF name, address ON ngo BEGIN
+            INSERT INTO ngo_fts(ngo_fts, rowid, name, address)
+            VALUES ('delete', old.id, old.name, old.address);
+            INSERT INTO ngo_fts(rowid, name, address)
+            VALUES (new.id, new.name, new.address);
+        END""")
+
+    op.execute("""
+        CREATE VIRTUAL TABLE donation_fts USING fts5(
+            description,
+            content='donation', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )""")
+    op.execute("""
+        CREATE TRIGGER donation_fts_ai AFTER INSERT ON donation BEGIN
+            INSERT INTO donation_fts(rowid, description)
+            VALUES (new.id, new.description);
+        END""")
+    op.execute("""
+        CREATE TRIGGER donation_fts_ad AFTER DELETE ON donation BEGIN
+            INSERT INTO donation_fts(donation_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+        END""")
+    op.execute("""
+        CREATE TRIGGER donation_fts_au AFTER UPDATE OF description ON donation BEGIN
+            INSERT INTO donation_fts(donation_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+            INSERT INTO donation_fts(rowid, description)
+            VALUES (new.id, new.description);
+        END""")
+
+    # Index the rows that already exist
+    op.execute("INSERT INTO ngo_fts(ngo_fts) VALUES ('rebuild')")
+    op.execute("INSERT INTO donation_fts(donation_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS donation_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS donation_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS donation_fts_ai")
+    op.execute("DROP TABLE IF EXISTS donation_fts")
+    op.execute("DROP TRIGGER IF EXISTS ngo_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS ngo_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS ngo_fts_ai")
+    op.execute("DROP TABLE IF EXISTS ngo_fts")
@@ -0,0 +1,33 @@
+"""Add user.total_money_donated running total
+
+Revision ID: c5a9e3d7b2f0
+Revises: 8d4c2e6f1a5b
+Create Date: 2026-10-19 12:20:51.774302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a9e3d7b2f0'
+down_revision = '8d4c2e6f1a5b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_money_donated', sa.Float(), nullable=True))
+
+    # Fill it in from the money donations logged so far
+    op.execute("""
+        UPDATE "user" SET total_money_donated = COALESCE((
+            SELECT SUM(donation.amount) FROM donation
+            WHERE donation.user_id = "user".id AND donation.donation_type = 'Money'
+        ), 0.0)""")
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('total_money_donated')
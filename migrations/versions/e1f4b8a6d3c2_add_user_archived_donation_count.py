@@ -0,0 +1,37 @@
+"""Add user.archived_donation_count
+
+Revision ID: e1f4b8a6d3c2
+Revises: c5a9e3d7b2f0
+Create Date: 2026-10-19 14:05:33.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f4b8a6d3c2'
+down_revision = 'c5a9e3d7b2f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('archived_donation_count', sa.Integer(), nullable=True))
+
+    # If donations were already archived into this database, count them.
+    # (archived_donation is created by 'flask archive-donations', not here.)
+    if sa.inspect(op.get_bind()).has_table('archived_donation'):
+        op.execute("""
+            UPDATE "user" SET archived_donation_count = (
+                SELECT count(*) FROM archived_donation
+                WHERE archived_donation.user_id = "user".id
+            )""")
+    else:
+        op.execute('UPDATE "user" SET archived_donation_count = 0')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('archived_donation_count')
@@ -4,6 +4,7 @@ from app import create_app, db
 from app.models import User, Donation, NGO
 
 # Create the Flask app instance
+# (set FLASK_CONFIG=production or testing to pick another config profile)
 app = create_app()
 
 @app.shell_context_processor
@@ -0,0 +1,37 @@
+import pytest
+from app import create_app, db
+from app.models import User, NGO
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    """A fresh app on an in-memory database for each test."""
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='alice', email='alice@example.com')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def ngo(app):
+    ngo = NGO(name='Test Center', address='1 Test Road, Chennai')
+    db.session.add(ngo)
+    db.session.commit()
+    return ngo
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.archive import archive_donations
+from app.models import User, Donation, ArchivedDonation
+
+
+@pytest.fixture
+def folders(app, tmp_path):
+    """Points uploads and archive bundles at a temp dir."""
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+    app.config['ARCHIVE_FOLDER'] = str(tmp_path / 'archive')
+    (tmp_path / 'uploads').mkdir()
+    return tmp_path
+
+
+def add_donation(user, ngo, days_ago, image=None):
+    donation = Donation(donation_type='Clothes', estimated_weight_kg=1.0, image_filename=image,
+                        user_id=user.id, ngo_id=ngo.id,
+                        timestamp=datetime.utcnow() - timedelta(days=days_ago))
+    db.session.add(donation)
+    db.session.commit()
+    return donation
+
+
+def login(client):
+    client.post('/login', data={'username': 'alice', 'password': 'secret'})
+
+
+def test_archive_moves_old_donations_and_images(folders, user, ngo):
+    (folders / 'uploads' / 'old.png').write_bytes(b'image')
+    add_donation(user, ngo, days_ago=400, image='old.png')
+    add_donation(user, ngo, days_ago=10)
+
+    assert archive_donations(365) == 1
+    assert Donation.query.count() == 1
+    archived = ArchivedDonation.query.one()
+    assert archived.image_bundle is not None
+    assert not (folders / 'uploads' / 'old.png').exists()
+    assert db.session.get(User, user.id).archived_donation_count == 1
+
+
+def test_profile_shows_fully_archived_history(folders, client, user, ngo):
+    add_donation(user, ngo, days_ago=400)
+    archive_donations(365)
+    login(client)
+
+    page = client.get('/profile').get_data(as_text=True)
+    assert 'You have not logged any donations yet.' not in page
+    assert page.count('donation-item') == 1
+
+
+def test_profile_has_no_older_link_without_archive(client, user, ngo):
+    add_donation(user, ngo, days_ago=1)
+    login(client)
+
+    page = client.get('/profile').get_data(as_text=True)
+    assert page.count('donation-item') == 1
+    assert 'Older donations' not in page
+
+
+def test_new_user_sees_empty_message(client, user):
+    login(client)
+    page = client.get('/profile').get_data(as_text=True)
+    assert 'You have not logged any donations yet.' in page
+    assert 'Older donations' not in page
+
+
+def test_rerun_after_crash_reuses_existing_bundle(folders, user, ngo):
+    (folders / 'uploads' / 'old.png').write_bytes(b'image')
+    donation = add_donation(user, ngo, days_ago=400, image='old.png')
+    columns = {col: getattr(donation, col) for col in
+               ('id', 'donation_type', 'estimated_weight_kg', 'image_filename',
+                'timestamp', 'user_id', 'ngo_id')}
+    archive_donations(365)
+
+    # Give the first bundle a distinct name, as a later run would
+    archived = ArchivedDonation.query.one()
+    bundle = 'earlier-run.zip'
+    (folders / 'archive' / archived.image_bundle).rename(folders / 'archive' / bundle)
+    archived.image_bundle = bundle
+    db.session.commit()
+
+    # Put things back the way a crash between the copy and the delete leaves them
+    db.session.add(Donation(**columns))
+    db.session.commit()
+    (folders / 'uploads' / 'old.png').write_bytes(b'image')
+
+    archive_donations(365)
+    assert ArchivedDonation.query.one().image_bundle == bundle
+    assert sorted(p.name for p in (folders / 'archive').iterdir()) == [bundle]
+    assert not (folders / 'uploads' / 'old.png').exists()
@@ -0,0 +1,39 @@
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import User, normalize_hash_method
+
+
+def test_normalize_hash_method_fills_in_werkzeug_defaults():
+    assert normalize_hash_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+    assert normalize_hash_method('pbkdf2:sha512').startswith('pbkdf2:sha512:')
+    assert normalize_hash_method('scrypt') == 'scrypt:32768:8:1'
+
+
+def test_fresh_hash_does_not_need_rehash(user):
+    assert user.check_password('secret')
+    assert not user.check_password('wrong')
+    assert not user.password_needs_rehash()
+
+
+def test_outdated_hash_is_upgraded_on_login(app, client, user):
+    user.password_hash = generate_password_hash('secret', method='pbkdf2:sha256:2000')
+    db.session.commit()
+    assert user.password_needs_rehash()
+
+    response = client.post('/login', data={'username': 'alice', 'password': 'secret'})
+    assert response.status_code == 302
+
+    user = db.session.get(User, user.id)
+    assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    assert not user.password_needs_rehash()
+    assert user.check_password('secret')
+
+
+def test_failed_login_keeps_old_hash(client, user):
+    old_hash = generate_password_hash('secret', method='pbkdf2:sha256:2000')
+    user.password_hash = old_hash
+    db.session.commit()
+
+    client.post('/login', data={'username': 'alice', 'password': 'wrong'})
+    assert db.session.get(User, user.id).password_hash == old_hash
+
@@ -0,0 +1,84 @@
+import os
+import pytest
+from app import create_app, db, limiter
+from app.models import User
+from app.ratelimit import SQLiteStore, _refill, _take
+from config import TestingConfig
+
+
+class LimitedConfig(TestingConfig):
+    RATELIMIT_LIMITS = {'donate': (2, 600)}
+
+
+@pytest.fixture
+def limited_client():
+    """A logged-in client on an app allowing 2 donate POSTs and no grading limit."""
+    app = create_app(LimitedConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username='alice', email='alice@example.com')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        client = app.test_client()
+        client.post('/login', data={'username': 'alice', 'password': 'secret'})
+        yield client
+        db.session.remove()
+        db.drop_all()
+
+
+def test_refill_starts_full_and_caps_at_capacity():
+    assert _refill(None, 0, 100, capacity=5, rate=1) == 5
+    assert _refill(1.0, 100, 102, capacity=5, rate=1) == 3
+    assert _refill(4.0, 100, 200, capacity=5, rate=1) == 5
+
+
+def test_take_allows_then_denies_with_retry_after():
+    assert _take(1.5, capacity=5, rate=0.5) == (0.5, True, 0.0)
+    tokens, allowed, retry_after = _take(0.5, capacity=5, rate=0.5)
+    assert (tokens, allowed) == (0.5, False)
+    assert retry_after == 1.0 # Half a token at 0.5 tokens/sec
+
+
+def test_hit_allows_unconfigured_names(app):
+    assert limiter.hit('no-such-limit') == (True, 0)
+    assert limiter.level('no-such-limit') is None
+
+
+def test_hit_allows_everything_when_disabled(app):
+    limiter.enabled = False
+    for _ in range(50):
+        assert limiter.hit('donate', 1) == (True, 0)
+    assert limiter.level('donate', 1) is None
+
+
+def test_donate_over_burst_gets_429(limited_client):
+    # Empty POSTs still use a token: the limit is checked before the form
+    for _ in range(2):
+        assert limited_client.post('/donate').status_code == 200
+    response = limited_client.post('/donate')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_ratelimits_null_for_removed_limit(limited_client):
+    levels = limited_client.get('/ratelimits').get_json()
+    assert levels['donate'] == 2
+    assert levels['ai_grade'] is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_sqlite_store_reconnects_after_fork(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'ratelimit.db'))
+    # Setting up the schema must not leave a cached connection behind
+    assert getattr(store._local, 'conn', None) is None
+    parent_conn = store._connect()
+
+    pid = os.fork()
+    if pid == 0:
+        # Child: must not reuse the parent's connection, and must still work
+        ok = store._connect() is not parent_conn and store.take('k', 1, 1)[0]
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert store._connect() is parent_conn
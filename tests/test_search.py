@@ -0,0 +1,27 @@
+from app.search import build_match_query, search_ngos, _highlight, _MARK_START, _MARK_END, MAX_PER_PAGE
+
+
+def test_match_query_quotes_fts5_operators():
+    # Quotes, OR and * in the input are plain words, not FTS5 syntax
+    assert build_match_query('foo" OR bar*') == '"foo" "OR" "bar"*'
+
+
+def test_match_query_makes_last_word_a_prefix():
+    assert build_match_query('anna sal') == '"anna" "sal"*'
+
+
+def test_match_query_without_words_is_none():
+    assert build_match_query('') is None
+    assert build_match_query(None) is None
+    assert build_match_query('" * ( ) -') is None
+
+
+def test_highlight_escapes_everything_but_the_marks():
+    snippet = f'old <script>alert(1)</script> {_MARK_START}jacket{_MARK_END}'
+    assert str(_highlight(snippet)) == \
+        'old &lt;script&gt;alert(1)&lt;/script&gt; <mark>jacket</mark>'
+
+
+def test_empty_search_clamps_per_page(app):
+    assert search_ngos('', per_page=1000)['per_page'] == MAX_PER_PAGE
+    assert search_ngos('', per_page=0)['per_page'] == 1
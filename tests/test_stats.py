@@ -0,0 +1,39 @@
+from datetime import datetime
+from app import db
+from app.models import Donation, NGODailyStat
+from app.stats import backfill_daily_stats
+
+
+def test_new_donations_are_rolled_up_per_day(user, ngo):
+    day = datetime(2025, 3, 14, 10, 30)
+    db.session.add_all([
+        Donation(donation_type='Clothes', estimated_weight_kg=2.0, grade='Grade A',
+                 user_id=user.id, ngo_id=ngo.id, timestamp=day),
+        Donation(donation_type='Clothes', estimated_weight_kg=1.5, grade='Grade A',
+                 user_id=user.id, ngo_id=ngo.id, timestamp=day),
+        Donation(donation_type='Money', amount=100.0, currency='INR',
+                 user_id=user.id, ngo_id=ngo.id, timestamp=day),
+    ])
+    db.session.commit()
+
+    clothes = db.session.get(NGODailyStat, (ngo.id, day.date(), 'Clothes', 'Grade A'))
+    assert clothes.donation_count == 2
+    assert clothes.total_kg == 3.5
+
+    money = db.session.get(NGODailyStat, (ngo.id, day.date(), 'Money', ''))
+    assert money.donation_count == 1
+    assert money.total_amount == 100.0
+
+
+def test_backfill_matches_live_rollups(user, ngo):
+    for kg in (1.0, 2.5):
+        db.session.add(Donation(donation_type='Clothes', estimated_weight_kg=kg, grade='Grade B/C',
+                                user_id=user.id, ngo_id=ngo.id, timestamp=datetime(2025, 5, 1)))
+        db.session.commit()
+    live = [(r.day, r.donation_type, r.grade, r.donation_count, r.total_kg)
+            for r in NGODailyStat.query.order_by(NGODailyStat.day)]
+
+    assert backfill_daily_stats() == 1
+    rebuilt = [(r.day, r.donation_type, r.grade, r.donation_count, r.total_kg)
+               for r in NGODailyStat.query.order_by(NGODailyStat.day)]
+    assert rebuilt == live == [(datetime(2025, 5, 1).date(), 'Clothes', 'Grade B/C', 2, 3.5)]